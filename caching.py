@@ -0,0 +1,40 @@
+import logging
+import os
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Configuración de la caché (sin REDIS_URL se usa una caché en memoria del proceso)
+# La caché en memoria es propia de cada proceso: con varios workers de uvicorn una escritura solo
+# invalida la caché del worker que la atendió y los demás pueden devolver datos viejos hasta que
+# expiren, por eso REDIS_URL es obligatorio al usar más de un worker
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_PREFIX = "noesis"
+CACHE_EXPIRE = 60
+
+def init_cache():
+    if REDIS_URL:
+        backend = RedisBackend(aioredis.from_url(REDIS_URL))
+    else:
+        backend = InMemoryBackend()
+    FastAPICache.init(backend, prefix=CACHE_PREFIX, expire=CACHE_EXPIRE)
+
+def user_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None):
+    # Las claves quedan agrupadas por email para poder invalidarlas juntas
+    return f"{CACHE_PREFIX}:{kwargs['email']}:{request.url.path}"
+
+def path_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None):
+    # Para respuestas que no dependen de parámetros (la sesión de la base de datos cambia en cada petición)
+    return f"{CACHE_PREFIX}:{request.url.path}"
+
+async def invalidate_user_cache(email: str):
+    """Eliminar las respuestas en caché de un usuario después de modificar sus datos"""
+    try:
+        await FastAPICache.clear(namespace=email)
+    except Exception:
+        # Si la caché no está disponible las entradas expiran solas
+        logger.warning(f"Error al invalidar la caché de '{email}'", exc_info=True)
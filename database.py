@@ -1,27 +1,44 @@
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import os
 
 # Configuración de la base de datos
-DATABASE_URL = "sqlite:///./data/app_database.db"
+DATABASE_URL = "sqlite+aiosqlite:///./data/app_database.db"
 
 # Crear el directorio data si no existe
 os.makedirs("data", exist_ok=True)
 
-# Crear motor de base de datos
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Crear motor de base de datos asíncrono
+# aiosqlite usa NullPool por defecto con archivos, se reemplaza por un pool de conexiones reutilizables
+engine = create_async_engine(
+    DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    connect_args={"timeout": 30}
+)
+
+# Configurar cada conexión nueva: WAL permite lecturas concurrentes mientras se escribe
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
 
 # Crear sesión local
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 # Base declarativa para los modelos
 Base = declarative_base()
 
 # Dependencia para obtener la sesión de la base de datos
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,11 +1,21 @@
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import ORJSONResponse
+from fastapi_cache.decorator import cache
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from typing import Annotated, List, Optional
 
+from caching import init_cache, user_key_builder, path_key_builder, invalidate_user_cache
 from database import engine, get_db
-from models import Usuario, Favorito, Visita, Puntaje, Base
+from models import Usuario, Favorito, Puntaje, Base
+from migrations import run_migrations
+import queries
+from security import generate_salt, hash_password, verify_password
 from schemas import (
+    normalize_email,
     UsuarioRegistro, UsuarioLogin, UsuarioResponse, UsuarioInfo,
     FavoritoRequest, FavoritoResponse, FavoritosUsuarioResponse, FavoritoAddResponse,
     VisitaRequest, VisitaResponse, VisitasUsuarioResponse,
@@ -14,11 +24,24 @@ from schemas import (
     HealthResponse, RootResponse
 )
 
-# Crear las tablas
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Crear las tablas y actualizar las bases de datos existentes
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(run_migrations)
+    init_cache()
+    yield
+    await engine.dispose()
 
 # Crear la aplicación FastAPI
-app = FastAPI(title="API Usuarios, Favoritos, Visitas y Puntajes Noesis", version="2.0.0")
+# ORJSONResponse serializa con orjson (Rust) en lugar del módulo json de la biblioteca estándar
+app = FastAPI(
+    title="API Usuarios, Favoritos, Visitas y Puntajes Noesis",
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Habilitar CORS
 app.add_middleware(
@@ -29,160 +52,191 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# fastapi-cache2 agrega "Cache-Control: max-age=..." a las respuestas que guarda en caché; para los datos
+# de usuario eso dejaría copias en el navegador o en proxies que la invalidación del servidor no alcanza
+# (las escrituras usan otras URLs), así que se obliga a revalidar siempre (el ETag permite responder 304)
+# Middleware ASGI puro: solo reescribe la cabecera al enviarse, sin el costo de BaseHTTPMiddleware
+class NoCacheDatosUsuario:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/usuarios"):
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_no_cache(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["Cache-Control"] = "private, no-cache"
+            await send(message)
+        
+        await self.app(scope, receive, send_no_cache)
+
+app.add_middleware(NoCacheDatosUsuario)
+
+# Email de la ruta normalizado igual que en los schemas de registro y login
+EmailPath = Annotated[str, Depends(normalize_email)]
+
 # Funciones auxiliares
-def get_user_by_email(db: Session, email: str):
-    return db.query(Usuario).filter(Usuario.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(queries.USER_BY_EMAIL, {"email": email})).scalar_one_or_none()
+
+async def get_user_id_by_email(db: AsyncSession, email: str):
+    # Solo se necesita el id, no hace falta cargar el objeto Usuario completo
+    return (await db.execute(queries.USER_ID_BY_EMAIL, {"email": email})).scalar()
 
-def create_user(db: Session, email: str, password: str):
-    db_user = Usuario(email=email, password=password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+async def create_user(db: AsyncSession, email: str, password: str):
+    # El hash se calcula fuera del event loop para no bloquear otras peticiones
+    salt = generate_salt()
+    password_hash = await run_in_threadpool(hash_password, password, salt)
+    db_user = Usuario(email=email, password_hash=password_hash, salt=salt)
     
-    # Crear puntaje inicial
+    # Crear puntaje inicial: al asociarlo por la relación, SQLAlchemy inserta ambos en la misma transacción
     db_puntaje = Puntaje(
-        usuario_id=db_user.id,
+        usuario=db_user,
         puntaje_obtenido=0,
         puntaje_total=20,
         nivel="Básico"
     )
-    db.add(db_puntaje)
-    db.commit()
+    db.add_all([db_user, db_puntaje])
+    await db.commit()
     
     return db_user
 
 # Endpoints de usuarios
 @app.get("/usuarios", response_model=List[UsuarioResponse])
-async def get_usuarios(db: Session = Depends(get_db)):
-    """Obtener todos los usuarios (solo email y password para compatibilidad)"""
-    usuarios = db.query(Usuario).all()
-    # Manteniendo compatibilidad con el frontend actual
-    return [{"email": user.email, "password": user.password} for user in usuarios]
+async def get_usuarios(
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="Último email de la página anterior (más eficiente que offset)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Obtener los usuarios paginados y ordenados por email (solo email)"""
+    usuarios = (await db.execute(
+        queries.USER_EMAILS_PAGE,
+        {"after": after or "", "limit": limit, "offset": offset}
+    )).all()
+    return [UsuarioResponse.model_validate(usuario) for usuario in usuarios]
 
 @app.post("/usuarios/registro", response_model=RegistroResponse)
-async def registrar_usuario(usuario: UsuarioRegistro, db: Session = Depends(get_db)):
+async def registrar_usuario(usuario: UsuarioRegistro, db: AsyncSession = Depends(get_db)):
     """Registrar un nuevo usuario"""
     # Verificar si el email ya existe
-    if get_user_by_email(db, usuario.email):
+    if await get_user_id_by_email(db, usuario.email) is not None:
         raise HTTPException(status_code=400, detail="El email ya está registrado")
     
     # Crear nuevo usuario
-    nuevo_usuario = create_user(db, usuario.email, usuario.password)
+    nuevo_usuario = await create_user(db, usuario.email, usuario.password)
     
     return {"message": "Usuario registrado exitosamente", "email": usuario.email}
 
 @app.post("/usuarios/login", response_model=LoginResponse)
-async def login_usuario(usuario: UsuarioLogin, db: Session = Depends(get_db)):
+async def login_usuario(usuario: UsuarioLogin, db: AsyncSession = Depends(get_db)):
     """Autenticar usuario"""
-    usuario_encontrado = get_user_by_email(db, usuario.email)
+    usuario_encontrado = await get_user_by_email(db, usuario.email)
     
     if not usuario_encontrado:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    if usuario_encontrado.password != usuario.password:
+    if not await run_in_threadpool(
+        verify_password, usuario.password, usuario_encontrado.salt, usuario_encontrado.password_hash
+    ):
         raise HTTPException(status_code=401, detail="Contraseña incorrecta")
     
     return {"message": "Login exitoso", "email": usuario.email}
 
 @app.get("/usuarios/{email}", response_model=UsuarioInfo)
-async def obtener_usuario(email: str, db: Session = Depends(get_db)):
+async def obtener_usuario(email: EmailPath, db: AsyncSession = Depends(get_db)):
     """Obtener información de un usuario específico"""
-    usuario = get_user_by_email(db, email)
-    
-    if not usuario:
+    if await get_user_id_by_email(db, email) is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    return {"email": usuario.email}
+    return {"email": email}
 
 @app.delete("/usuarios/{email}", response_model=MessageResponse)
-async def eliminar_usuario(email: str, db: Session = Depends(get_db)):
+async def eliminar_usuario(email: EmailPath, db: AsyncSession = Depends(get_db)):
     """Eliminar un usuario y todos sus datos relacionados"""
-    usuario = get_user_by_email(db, email)
+    # Las relaciones se cargan por adelantado porque en modo asíncrono no se permite la carga perezosa
+    usuario = (await db.execute(queries.USER_WITH_RELATIONS_BY_EMAIL, {"email": email})).scalar_one_or_none()
     
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     # SQLAlchemy eliminará automáticamente los datos relacionados gracias a cascade="all, delete-orphan"
-    db.delete(usuario)
-    db.commit()
+    await db.delete(usuario)
+    await db.commit()
+    await invalidate_user_cache(email)
     
     return {"message": "Usuario, favoritos, visitas y puntajes eliminados exitosamente"}
 
 # Endpoints de favoritos
 @app.post("/usuarios/{email}/favoritos", response_model=FavoritoAddResponse)
-async def agregar_favorito(email: str, favorito: FavoritoRequest, db: Session = Depends(get_db)):
+async def agregar_favorito(email: EmailPath, favorito: FavoritoRequest, db: AsyncSession = Depends(get_db)):
     """Agregar una clase a favoritos"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
+    usuario_id = await get_user_id_by_email(db, email)
+    if usuario_id is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     # Verificar si ya está en favoritos
-    favorito_existente = db.query(Favorito).filter(
-        Favorito.usuario_id == usuario.id,
-        Favorito.clase_id == favorito.clase_id
-    ).first()
+    favorito_existente = (await db.execute(
+        queries.FAVORITO_ID_BY_USUARIO_AND_CLASE,
+        {"usuario_id": usuario_id, "clase_id": favorito.clase_id}
+    )).first()
     
     if favorito_existente:
         raise HTTPException(status_code=400, detail="La clase ya está en favoritos")
     
     # Crear nuevo favorito
     nuevo_favorito = Favorito(
-        usuario_id=usuario.id,
+        usuario_id=usuario_id,
         clase_id=favorito.clase_id,
         nombre_clase=favorito.nombre_clase,
         imagen_path=favorito.imagen_path
     )
     
     db.add(nuevo_favorito)
-    db.commit()
-    db.refresh(nuevo_favorito)
+    await db.commit()
+    await invalidate_user_cache(email)
     
+    # La respuesta solo contiene datos enviados por el cliente, no hace falta releer el favorito
     return {
         "message": "Favorito agregado exitosamente",
         "favorito": {
-            "clase_id": nuevo_favorito.clase_id,
-            "nombre_clase": nuevo_favorito.nombre_clase,
-            "imagen_path": nuevo_favorito.imagen_path
+            "clase_id": favorito.clase_id,
+            "nombre_clase": favorito.nombre_clase,
+            "imagen_path": favorito.imagen_path
         }
     }
 
 @app.delete("/usuarios/{email}/favoritos/{clase_id}", response_model=MessageResponse)
-async def remover_favorito(email: str, clase_id: str, db: Session = Depends(get_db)):
+async def remover_favorito(email: EmailPath, clase_id: str, db: AsyncSession = Depends(get_db)):
     """Remover una clase de favoritos"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-    favorito = db.query(Favorito).filter(
-        Favorito.usuario_id == usuario.id,
-        Favorito.clase_id == clase_id
-    ).first()
+    favorito = (await db.execute(
+        queries.FAVORITO_BY_EMAIL_AND_CLASE,
+        {"email": email, "clase_id": clase_id}
+    )).scalar_one_or_none()
     
     if not favorito:
+        if await get_user_id_by_email(db, email) is None:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
         raise HTTPException(status_code=404, detail="Favorito no encontrado")
     
-    db.delete(favorito)
-    db.commit()
+    await db.delete(favorito)
+    await db.commit()
+    await invalidate_user_cache(email)
     
     return {"message": "Favorito removido exitosamente"}
 
 @app.get("/usuarios/{email}/favoritos", response_model=FavoritosUsuarioResponse)
-async def obtener_favoritos_usuario(email: str, db: Session = Depends(get_db)):
+@cache(key_builder=user_key_builder)
+async def obtener_favoritos_usuario(email: EmailPath, db: AsyncSession = Depends(get_db)):
     """Obtener los favoritos de un usuario"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    # Solo se leen las columnas de la respuesta, sin construir objetos Favorito
+    favoritos_list = (await db.execute(queries.FAVORITOS_BY_EMAIL, {"email": email})).mappings().all()
     
-    favoritos = db.query(Favorito).filter(Favorito.usuario_id == usuario.id).all()
-    
-    favoritos_list = [
-        {
-            "clase_id": fav.clase_id,
-            "nombre_clase": fav.nombre_clase,
-            "imagen_path": fav.imagen_path
-        }
-        for fav in favoritos
-    ]
+    # Solo se consulta el usuario cuando no hay favoritos, para distinguir el 404
+    if not favoritos_list and await get_user_id_by_email(db, email) is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     return {
         "email": email,
@@ -191,76 +245,66 @@ async def obtener_favoritos_usuario(email: str, db: Session = Depends(get_db)):
     }
 
 @app.put("/usuarios/{email}/favoritos/{clase_id}", response_model=MessageResponse)
-async def actualizar_favorito(email: str, clase_id: str, favorito_actualizado: FavoritoRequest, db: Session = Depends(get_db)):
+async def actualizar_favorito(email: EmailPath, clase_id: str, favorito_actualizado: FavoritoRequest, db: AsyncSession = Depends(get_db)):
     """Actualizar información de un favorito"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-    favorito = db.query(Favorito).filter(
-        Favorito.usuario_id == usuario.id,
-        Favorito.clase_id == clase_id
-    ).first()
+    favorito = (await db.execute(
+        queries.FAVORITO_BY_EMAIL_AND_CLASE,
+        {"email": email, "clase_id": clase_id}
+    )).scalar_one_or_none()
     
     if not favorito:
+        if await get_user_id_by_email(db, email) is None:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
         raise HTTPException(status_code=404, detail="Favorito no encontrado")
     
+    # Evitar duplicar una clase que ya está en favoritos
+    if favorito_actualizado.clase_id != clase_id:
+        favorito_existente = (await db.execute(
+            queries.FAVORITO_ID_BY_USUARIO_AND_CLASE,
+            {"usuario_id": favorito.usuario_id, "clase_id": favorito_actualizado.clase_id}
+        )).first()
+        
+        if favorito_existente:
+            raise HTTPException(status_code=400, detail="La clase ya está en favoritos")
+    
     favorito.clase_id = favorito_actualizado.clase_id
     favorito.nombre_clase = favorito_actualizado.nombre_clase
     favorito.imagen_path = favorito_actualizado.imagen_path
     
-    db.commit()
+    await db.commit()
+    await invalidate_user_cache(email)
     
     return {"message": "Favorito actualizado exitosamente"}
 
 # Endpoints de visitas
 @app.post("/usuarios/{email}/visitas", response_model=MessageResponse)
-async def registrar_visita(email: str, visita: VisitaRequest, db: Session = Depends(get_db)):
+async def registrar_visita(email: EmailPath, visita: VisitaRequest, db: AsyncSession = Depends(get_db)):
     """Registrar una visita a una clase"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
+    # Crear la visita o incrementar su contador en una sola sentencia atómica
+    result = await db.execute(queries.UPSERT_VISITA, {"email": email, "clase_id": visita.clase_id})
+    
+    # Si el email no existe el SELECT no produce filas y no se inserta nada
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    # Buscar si ya existe una visita para esta clase
-    visita_existente = db.query(Visita).filter(
-        Visita.usuario_id == usuario.id,
-        Visita.clase_id == visita.clase_id
-    ).first()
-    
-    if visita_existente:
-        # Incrementar contador
-        visita_existente.count += 1
-        db.commit()
-    else:
-        # Crear nueva visita
-        nueva_visita = Visita(
-            usuario_id=usuario.id,
-            clase_id=visita.clase_id,
-            count=1
-        )
-        db.add(nueva_visita)
-        db.commit()
+    await db.commit()
+    await invalidate_user_cache(email)
     
     return {"message": "Visita registrada exitosamente"}
 
 @app.get("/usuarios/{email}/visitas", response_model=VisitasUsuarioResponse)
-async def obtener_visitas_usuario(email: str, db: Session = Depends(get_db)):
+@cache(key_builder=user_key_builder)
+async def obtener_visitas_usuario(email: EmailPath, db: AsyncSession = Depends(get_db)):
     """Obtener las visitas de un usuario"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    # Solo se leen las columnas de la respuesta, sin construir objetos Visita
+    # (la columna total_visitas de cada fila la descarta el response_model de VisitaResponse)
+    visitas_list = (await db.execute(queries.VISITAS_BY_EMAIL, {"email": email})).mappings().all()
     
-    visitas = db.query(Visita).filter(Visita.usuario_id == usuario.id).all()
-    
-    visitas_list = [
-        {
-            "clase_id": visita.clase_id,
-            "count": visita.count
-        }
-        for visita in visitas
-    ]
+    # Solo se consulta el usuario cuando no hay visitas, para distinguir el 404
+    if not visitas_list and await get_user_id_by_email(db, email) is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    total_visitas = sum(visita.count for visita in visitas)
+    total_visitas = visitas_list[0]["total_visitas"] if visitas_list else 0
     
     return {
         "email": email,
@@ -270,25 +314,25 @@ async def obtener_visitas_usuario(email: str, db: Session = Depends(get_db)):
 
 # Endpoints de puntajes
 @app.get("/usuarios/{email}/puntajes", response_model=PuntajeResponse)
-async def obtener_puntajes_usuario(email: str, db: Session = Depends(get_db)):
+@cache(key_builder=user_key_builder)
+async def obtener_puntajes_usuario(email: EmailPath, db: AsyncSession = Depends(get_db)):
     """Obtener los puntajes de un usuario"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-    puntaje = db.query(Puntaje).filter(Puntaje.usuario_id == usuario.id).first()
+    puntaje = (await db.execute(queries.PUNTAJE_BY_EMAIL, {"email": email})).scalars().first()
     
     if not puntaje:
+        usuario_id = await get_user_id_by_email(db, email)
+        if usuario_id is None:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+        
         # Crear puntaje inicial si no existe
         puntaje = Puntaje(
-            usuario_id=usuario.id,
+            usuario_id=usuario_id,
             puntaje_obtenido=0,
             puntaje_total=20,
             nivel="Básico"
         )
         db.add(puntaje)
-        db.commit()
-        db.refresh(puntaje)
+        await db.commit()
     
     return {
         "email": email,
@@ -298,37 +342,38 @@ async def obtener_puntajes_usuario(email: str, db: Session = Depends(get_db)):
     }
 
 @app.post("/usuarios/{email}/puntajes", response_model=PuntajeUpdateResponse)
-async def actualizar_puntajes_usuario(email: str, puntaje_request: PuntajeRequest, db: Session = Depends(get_db)):
+async def actualizar_puntajes_usuario(email: EmailPath, puntaje_request: PuntajeRequest, db: AsyncSession = Depends(get_db)):
     """Actualizar los puntajes de un usuario solo si es mejor que el anterior"""
-    usuario = get_user_by_email(db, email)
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-    puntaje = db.query(Puntaje).filter(Puntaje.usuario_id == usuario.id).first()
-    is_new_best = False
-    
-    if not puntaje:
-        # Crear nuevo puntaje
-        puntaje = Puntaje(
-            usuario_id=usuario.id,
-            puntaje_obtenido=puntaje_request.puntaje_obtenido,
-            puntaje_total=puntaje_request.puntaje_total,
-            nivel=puntaje_request.nivel
-        )
-        db.add(puntaje)
-        is_new_best = True
-    else:
-        # Comparar porcentajes
-        porcentaje_actual = (puntaje.puntaje_obtenido / puntaje.puntaje_total) * 100
-        porcentaje_nuevo = (puntaje_request.puntaje_obtenido / puntaje_request.puntaje_total) * 100
+    # Comparar porcentajes dentro del UPDATE, multiplicando en cruz para evitar divisiones
+    result = await db.execute(queries.UPDATE_PUNTAJE_IF_BETTER, {
+        "email": email,
+        "nuevo_obtenido": puntaje_request.puntaje_obtenido,
+        "nuevo_total": puntaje_request.puntaje_total,
+        "nuevo_nivel": puntaje_request.nivel
+    })
+    is_new_best = result.rowcount > 0
+    
+    if not is_new_best:
+        # Distinguir entre usuario inexistente, puntaje inexistente y puntaje no superado
+        fila = (await db.execute(queries.USER_ID_AND_PUNTAJE_ID_BY_EMAIL, {"email": email})).first()
+        
+        if fila is None:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
-        if porcentaje_nuevo > porcentaje_actual:
-            puntaje.puntaje_obtenido = puntaje_request.puntaje_obtenido
-            puntaje.puntaje_total = puntaje_request.puntaje_total
-            puntaje.nivel = puntaje_request.nivel
+        usuario_id, puntaje_id = fila
+        if puntaje_id is None:
+            # Crear nuevo puntaje
+            db.add(Puntaje(
+                usuario_id=usuario_id,
+                puntaje_obtenido=puntaje_request.puntaje_obtenido,
+                puntaje_total=puntaje_request.puntaje_total,
+                nivel=puntaje_request.nivel
+            ))
             is_new_best = True
     
-    db.commit()
+    if is_new_best:
+        await db.commit()
+        await invalidate_user_cache(email)
     
     return {
         "message": "Puntaje procesado exitosamente",
@@ -341,31 +386,35 @@ async def actualizar_puntajes_usuario(email: str, puntaje_request: PuntajeReques
     }
 
 # Endpoints de información general
+# La respuesta raíz no depende de la petición, se construye una sola vez al importar el módulo
+ROOT_RESPONSE = {
+    "message": "API de usuarios, favoritos, visitas y puntajes SQLite",
+    "version": "2.0.0",
+    "database": "SQLite",
+    "endpoints": {
+        "usuarios": "/usuarios/{email}",
+        "registro": "/usuarios/registro",
+        "login": "/usuarios/login",
+        "favoritos": "/usuarios/{email}/favoritos",
+        "visitas": "/usuarios/{email}/visitas",
+        "puntajes": "/usuarios/{email}/puntajes"
+    }
+}
+
 @app.get("/", response_model=RootResponse)
 async def root():
     """Endpoint raíz de la API"""
-    return {
-        "message": "API de usuarios, favoritos, visitas y puntajes SQLite",
-        "version": "2.0.0",
-        "database": "SQLite",
-        "endpoints": {
-            "usuarios": "/usuarios/{email}",
-            "registro": "/usuarios/registro",
-            "login": "/usuarios/login",
-            "favoritos": "/usuarios/{email}/favoritos",
-            "visitas": "/usuarios/{email}/visitas",
-            "puntajes": "/usuarios/{email}/puntajes"
-        }
-    }
+    return ROOT_RESPONSE
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+@cache(expire=5, key_builder=path_key_builder)
+async def health_check(db: AsyncSession = Depends(get_db)):
     """Verificar el estado de la API"""
     try:
-        usuarios_count = db.query(Usuario).count()
-        favoritos_count = db.query(Favorito).count()
-        visitas_count = db.query(Visita).count()
-        puntajes_count = db.query(Puntaje).count()
+        # Los cuatro conteos se obtienen en una sola consulta
+        usuarios_count, favoritos_count, visitas_count, puntajes_count = (
+            await db.execute(queries.TABLE_COUNTS)
+        ).one()
         
         return {
             "status": "healthy",
@@ -381,4 +430,4 @@ async def health_check(db: Session = Depends(get_db)):
             "status": "unhealthy",
             "error": str(e),
             "database_ok": False
-        }
\ No newline at end of file
+        }
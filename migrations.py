@@ -0,0 +1,106 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from models import Base
+from schemas import normalize_email
+from security import generate_salt, hash_password
+
+def run_migrations(connection: Connection):
+    """Actualizar bases de datos creadas con versiones anteriores del esquema"""
+    _dedupe_favoritos(connection)
+    _dedupe_visitas(connection)
+    _create_missing_indexes(connection)
+    _hash_plaintext_passwords(connection)
+    _normalize_emails(connection)
+
+def _index_names(connection: Connection, tabla: str):
+    return {indice["name"] for indice in inspect(connection).get_indexes(tabla)}
+
+def _dedupe_favoritos(connection: Connection):
+    # Con el índice único ya creado no puede haber duplicados
+    if "ix_favoritos_usuario_clase" in _index_names(connection, "favoritos"):
+        return
+    
+    # Conservar el favorito más antiguo de cada (usuario, clase) antes de crear el índice único
+    connection.execute(text("""
+        DELETE FROM favoritos
+        WHERE id NOT IN (SELECT MIN(id) FROM favoritos GROUP BY usuario_id, clase_id)
+    """))
+
+def _dedupe_visitas(connection: Connection):
+    # Con el índice único ya creado no puede haber duplicados
+    if "ix_visitas_usuario_clase" in _index_names(connection, "visitas"):
+        return
+    
+    # Acumular los contadores duplicados en la visita más antigua y eliminar el resto
+    connection.execute(text("""
+        UPDATE visitas
+        SET count = (
+            SELECT SUM(v.count) FROM visitas v
+            WHERE v.usuario_id = visitas.usuario_id AND v.clase_id = visitas.clase_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM visitas GROUP BY usuario_id, clase_id HAVING COUNT(*) > 1
+        )
+    """))
+    connection.execute(text("""
+        DELETE FROM visitas
+        WHERE id NOT IN (SELECT MIN(id) FROM visitas GROUP BY usuario_id, clase_id)
+    """))
+
+def _create_missing_indexes(connection: Connection):
+    # create_all no agrega índices nuevos a tablas que ya existen
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+def _hash_plaintext_passwords(connection: Connection):
+    # Las versiones anteriores guardaban la contraseña en texto plano en la columna password
+    columnas = {columna["name"] for columna in inspect(connection).get_columns("usuarios")}
+    if "password" not in columnas:
+        return
+    
+    connection.execute(text("ALTER TABLE usuarios ADD COLUMN password_hash VARCHAR NOT NULL DEFAULT ''"))
+    connection.execute(text("ALTER TABLE usuarios ADD COLUMN salt VARCHAR NOT NULL DEFAULT ''"))
+    
+    usuarios = connection.execute(text("SELECT id, password FROM usuarios")).all()
+    for usuario_id, password in usuarios:
+        salt = generate_salt()
+        connection.execute(
+            text("UPDATE usuarios SET password_hash = :password_hash, salt = :salt WHERE id = :id"),
+            {"password_hash": hash_password(password, salt), "salt": salt, "id": usuario_id}
+        )
+    
+    connection.execute(text("ALTER TABLE usuarios DROP COLUMN password"))
+
+def _normalize_emails(connection: Connection):
+    # Comprobación barata para no recorrer toda la tabla en cada arranque cuando ya está normalizada
+    # (lower y trim de SQLite solo tratan ASCII y espacios: cualquier carácter no ASCII o no imprimible
+    # fuerza la pasada en Python, que es la que normaliza igual que normalize_email)
+    pendiente = connection.execute(
+        text("SELECT 1 FROM usuarios WHERE email <> lower(trim(email)) OR email GLOB '*[^ -~]*' LIMIT 1")
+    ).first()
+    if pendiente is None:
+        return
+    
+    # Si dos cuentas quedan con el mismo email normalizado se conserva la más antigua
+    usuarios = connection.execute(text("SELECT id, email FROM usuarios ORDER BY id")).all()
+    vistos = set()
+    duplicados = []
+    renombrados = []
+    for usuario_id, email in usuarios:
+        normalizado = normalize_email(email)
+        if normalizado in vistos:
+            duplicados.append(usuario_id)
+        else:
+            vistos.add(normalizado)
+            if normalizado != email:
+                renombrados.append({"id": usuario_id, "email": normalizado})
+    
+    for usuario_id in duplicados:
+        for tabla in ("favoritos", "visitas", "puntajes"):
+            connection.execute(text(f"DELETE FROM {tabla} WHERE usuario_id = :id"), {"id": usuario_id})
+        connection.execute(text("DELETE FROM usuarios WHERE id = :id"), {"id": usuario_id})
+    
+    if renombrados:
+        connection.execute(text("UPDATE usuarios SET email = :email WHERE id = :id"), renombrados)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -7,12 +7,13 @@ class Usuario(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
-    password = Column(String, nullable=False)
+    password_hash = Column(String, nullable=False)
+    salt = Column(String, nullable=False)
     
-    # Relaciones
-    favoritos = relationship("Favorito", back_populates="usuario", cascade="all, delete-orphan")
-    visitas = relationship("Visita", back_populates="usuario", cascade="all, delete-orphan")
-    puntajes = relationship("Puntaje", back_populates="usuario", cascade="all, delete-orphan")
+    # Relaciones (lazy="raise" obliga a cargarlas explícitamente y evita consultas N+1 accidentales)
+    favoritos = relationship("Favorito", back_populates="usuario", cascade="all, delete-orphan", lazy="raise")
+    visitas = relationship("Visita", back_populates="usuario", cascade="all, delete-orphan", lazy="raise")
+    puntajes = relationship("Puntaje", back_populates="usuario", cascade="all, delete-orphan", lazy="raise")
 
 class Favorito(Base):
     __tablename__ = "favoritos"
@@ -24,7 +25,12 @@ class Favorito(Base):
     imagen_path = Column(String, nullable=False)
     
     # Relación
-    usuario = relationship("Usuario", back_populates="favoritos")
+    usuario = relationship("Usuario", back_populates="favoritos", lazy="raise")
+    
+    # Índice compuesto para las búsquedas por usuario y clase (también cubre las búsquedas solo por usuario)
+    __table_args__ = (
+        Index("ix_favoritos_usuario_clase", "usuario_id", "clase_id", unique=True),
+    )
 
 class Visita(Base):
     __tablename__ = "visitas"
@@ -35,16 +41,21 @@ class Visita(Base):
     count = Column(Integer, default=1)
     
     # Relación
-    usuario = relationship("Usuario", back_populates="visitas")
+    usuario = relationship("Usuario", back_populates="visitas", lazy="raise")
+    
+    # Índice compuesto para las búsquedas por usuario y clase (también cubre las búsquedas solo por usuario)
+    __table_args__ = (
+        Index("ix_visitas_usuario_clase", "usuario_id", "clase_id", unique=True),
+    )
 
 class Puntaje(Base):
     __tablename__ = "puntajes"
     
     id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
     puntaje_obtenido = Column(Integer, default=0)
     puntaje_total = Column(Integer, default=20)
     nivel = Column(String, default="Básico")
     
     # Relación
-    usuario = relationship("Usuario", back_populates="puntajes")
\ No newline at end of file
+    usuario = relationship("Usuario", back_populates="puntajes", lazy="raise")
\ No newline at end of file
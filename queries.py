@@ -0,0 +1,97 @@
+from sqlalchemy import Integer, String, bindparam, func, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
+
+from models import Usuario, Favorito, Visita, Puntaje
+
+# Sentencias construidas una sola vez al importar el módulo: SQLAlchemy reutiliza su clave
+# de caché y el SQL compilado en cada ejecución, solo cambian los parámetros
+
+# Usuarios
+USER_BY_EMAIL = select(Usuario).where(Usuario.email == bindparam("email"))
+
+USER_ID_BY_EMAIL = select(Usuario.id).where(Usuario.email == bindparam("email"))
+
+USER_WITH_RELATIONS_BY_EMAIL = (
+    select(Usuario)
+    .options(selectinload(Usuario.favoritos), selectinload(Usuario.visitas), selectinload(Usuario.puntajes))
+    .where(Usuario.email == bindparam("email"))
+)
+
+# Paginación por cursor sobre el índice único de email: cada página es un recorrido de rango del índice
+USER_EMAILS_PAGE = (
+    select(Usuario.email)
+    .where(Usuario.email > bindparam("after", type_=String))
+    .order_by(Usuario.email)
+    .limit(bindparam("limit", type_=Integer))
+    .offset(bindparam("offset", type_=Integer))
+)
+
+# Favoritos
+FAVORITOS_BY_EMAIL = (
+    select(Favorito.clase_id, Favorito.nombre_clase, Favorito.imagen_path)
+    .join(Usuario)
+    .where(Usuario.email == bindparam("email"))
+)
+
+FAVORITO_BY_EMAIL_AND_CLASE = (
+    select(Favorito)
+    .join(Usuario)
+    .where(Usuario.email == bindparam("email"), Favorito.clase_id == bindparam("clase_id"))
+)
+
+FAVORITO_ID_BY_USUARIO_AND_CLASE = select(Favorito.id).where(
+    Favorito.usuario_id == bindparam("usuario_id"),
+    Favorito.clase_id == bindparam("clase_id")
+)
+
+# Visitas
+# Cada fila incluye además el total de visitas del usuario, calculado por SQLite con una función de ventana
+VISITAS_BY_EMAIL = (
+    select(Visita.clase_id, Visita.count, func.sum(Visita.count).over().label("total_visitas"))
+    .join(Usuario)
+    .where(Usuario.email == bindparam("email"))
+)
+
+# Crea la visita o incrementa su contador; no inserta nada si el email no existe
+# (se usa la tabla y no la entidad: con parámetros el ORM trataría el INSERT como inserción masiva)
+UPSERT_VISITA = sqlite_insert(Visita.__table__).from_select(
+    ["usuario_id", "clase_id", "count"],
+    select(Usuario.id, bindparam("clase_id", type_=String), literal(1)).where(Usuario.email == bindparam("email"))
+).on_conflict_do_update(
+    index_elements=["usuario_id", "clase_id"],
+    set_={"count": Visita.__table__.c["count"] + 1}
+)
+
+# Puntajes
+PUNTAJE_BY_EMAIL = select(Puntaje).join(Usuario).where(Usuario.email == bindparam("email"))
+
+# Reemplaza el puntaje solo si el nuevo porcentaje es mayor (multiplicación en cruz, sin divisiones)
+UPDATE_PUNTAJE_IF_BETTER = (
+    update(Puntaje)
+    .where(
+        Puntaje.usuario_id == USER_ID_BY_EMAIL.scalar_subquery(),
+        Puntaje.puntaje_obtenido * bindparam("nuevo_total", type_=Integer)
+        < bindparam("nuevo_obtenido", type_=Integer) * Puntaje.puntaje_total
+    )
+    .values(
+        puntaje_obtenido=bindparam("nuevo_obtenido", type_=Integer),
+        puntaje_total=bindparam("nuevo_total", type_=Integer),
+        nivel=bindparam("nuevo_nivel", type_=String)
+    )
+    .execution_options(synchronize_session=False)
+)
+
+USER_ID_AND_PUNTAJE_ID_BY_EMAIL = (
+    select(Usuario.id, Puntaje.id)
+    .outerjoin(Puntaje, Puntaje.usuario_id == Usuario.id)
+    .where(Usuario.email == bindparam("email"))
+)
+
+# Health
+TABLE_COUNTS = select(
+    select(func.count()).select_from(Usuario).scalar_subquery(),
+    select(func.count()).select_from(Favorito).scalar_subquery(),
+    select(func.count()).select_from(Visita).scalar_subquery(),
+    select(func.count()).select_from(Puntaje).scalar_subquery()
+)
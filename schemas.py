@@ -1,84 +1,101 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Dict, List, Optional
+
+def normalize_email(email: str) -> str:
+    # Los emails se guardan y se buscan siempre en minúsculas para usar el índice único sin lower()
+    return email.strip().lower()
+
+# Base común: permite validar objetos ORM o filas directamente y hace los schemas inmutables
+class Schema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 # Schemas para Usuario
-class UsuarioRegistro(BaseModel):
+class UsuarioRegistro(Schema):
     email: str
     password: str
+    
+    _normalize_email = field_validator("email")(normalize_email)
 
-class UsuarioLogin(BaseModel):
+class UsuarioLogin(Schema):
     email: str
     password: str
+    
+    _normalize_email = field_validator("email")(normalize_email)
 
-class UsuarioResponse(BaseModel):
+class UsuarioResponse(Schema):
     email: str
-    password: str
 
-class UsuarioInfo(BaseModel):
+class UsuarioInfo(Schema):
     email: str
 
 # Schemas para Favorito
-class FavoritoRequest(BaseModel):
+class FavoritoRequest(Schema):
     clase_id: str
     nombre_clase: str
     imagen_path: str
 
-class FavoritoResponse(BaseModel):
+class FavoritoResponse(Schema):
     clase_id: str
     nombre_clase: str
     imagen_path: str
 
-class FavoritosUsuarioResponse(BaseModel):
+class FavoritosUsuarioResponse(Schema):
     email: str
     favoritos: List[FavoritoResponse]
     total: int
 
 # Schemas para Visita
-class VisitaRequest(BaseModel):
+class VisitaRequest(Schema):
     clase_id: str
 
-class VisitaResponse(BaseModel):
+class VisitaResponse(Schema):
     clase_id: str
     count: int
 
-class VisitasUsuarioResponse(BaseModel):
+class VisitasUsuarioResponse(Schema):
     email: str
     visitas: List[VisitaResponse]
     total_visitas: int
 
 # Schemas para Puntaje
-class PuntajeRequest(BaseModel):
+class PuntajeRequest(Schema):
+    puntaje_obtenido: int = Field(ge=0)
+    puntaje_total: int = Field(gt=0)
+    nivel: str
+
+class PuntajeResponse(Schema):
+    email: str
     puntaje_obtenido: int
     puntaje_total: int
     nivel: str
 
-class PuntajeResponse(BaseModel):
-    email: str
+class PuntajeUpdateData(Schema):
+    is_new_best: bool
     puntaje_obtenido: int
     puntaje_total: int
     nivel: str
 
-class PuntajeUpdateResponse(BaseModel):
+class PuntajeUpdateResponse(Schema):
     message: str
-    data: dict
+    data: PuntajeUpdateData
 
 # Schemas para respuestas generales
-class MessageResponse(BaseModel):
+class MessageResponse(Schema):
     message: str
 
-class RegistroResponse(BaseModel):
+class RegistroResponse(Schema):
     message: str
     email: str
 
-class LoginResponse(BaseModel):
+class LoginResponse(Schema):
     message: str
     email: str
 
-class FavoritoAddResponse(BaseModel):
+class FavoritoAddResponse(Schema):
     message: str
     favorito: FavoritoResponse
 
-class HealthResponse(BaseModel):
+class HealthResponse(Schema):
     status: str
     database: str
     usuarios_registrados: int
@@ -87,8 +104,8 @@ class HealthResponse(BaseModel):
     total_puntajes: int
     database_ok: bool
 
-class RootResponse(BaseModel):
+class RootResponse(Schema):
     message: str
     version: str
     database: str
-    endpoints: dict
\ No newline at end of file
+    endpoints: Dict[str, str]
\ No newline at end of file
@@ -0,0 +1,23 @@
+import hashlib
+import hmac
+import secrets
+
+# Parámetros del hash de contraseñas (PBKDF2-HMAC-SHA256 de hashlib, implementado en C por OpenSSL)
+PASSWORD_HASH_ALGORITHM = "sha256"
+PASSWORD_HASH_ITERATIONS = 100_000
+SALT_BYTES = 16
+
+def generate_salt() -> str:
+    return secrets.token_hex(SALT_BYTES)
+
+def hash_password(password: str, salt: str) -> str:
+    return hashlib.pbkdf2_hmac(
+        PASSWORD_HASH_ALGORITHM,
+        password.encode(),
+        salt.encode(),
+        PASSWORD_HASH_ITERATIONS
+    ).hex()
+
+def verify_password(password: str, salt: str, password_hash: str) -> bool:
+    # compare_digest evita filtrar información por diferencias de tiempo
+    return hmac.compare_digest(hash_password(password, salt), password_hash)